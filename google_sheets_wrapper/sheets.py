@@ -1,12 +1,18 @@
+import contextlib
+import hashlib
+import json
 import os
 import os.path
 import re
+import sqlite3
 import time
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
 
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
@@ -31,11 +37,26 @@ def get_credentials(client_secrets_path, credentials_path, port):
     return creds
 
 
-def authenticate(client_secrets_path, credentials_path, port=0):
+def authenticate(
+    client_secrets_path, credentials_path, port=0, http=None, timeout=None
+):
+    """Create a Sheets API service object
+
+    Pass `http` to send the requests through a custom `httplib2.Http`
+    instance (e.g. with a proxy or custom certificates) instead of the
+    default one created by `googleapiclient`. Pass `timeout` to set the
+    socket timeout in seconds of the default one; it is not applied to
+    `http`, which should be created with the timeout it needs. The transport
+    is authorized with the user's credentials."""
     credentials = get_credentials(
         client_secrets_path, credentials_path, port=port
     )
-    service = build('sheets', 'v4', credentials=credentials)
+    if http is None:
+        http = build_http()
+        if timeout is not None:
+            http.timeout = timeout
+    authorized_http = AuthorizedHttp(credentials, http=http)
+    service = build('sheets', 'v4', http=authorized_http)
     return service
 
 
@@ -96,15 +117,128 @@ def _wait():
         n_requests_made = 1
 
 
+_journal = None
+
+
+def open_journal(path):
+    """Record all `batchUpdate` and `update` requests in a SQLite journal
+
+    Every request is identified by its content and by the number of
+    identical requests made before it, and it is stored as pending before it
+    is sent and as done after it succeeds. When a job that crashed is run
+    again with the same journal, requests that are already done are skipped
+    instead of sent again, so the job resumes from the first request that
+    was not completed.
+
+    A request that is still pending may or may not have been applied before
+    the crash, so it is sent again. That is unsafe for requests that can't
+    be repeated, such as `move`.
+
+    Call `close_journal` when the job finishes, which removes all requests
+    from the journal, or use `journal` as a context manager. Otherwise the
+    next run of the job would skip every request made by this one."""
+    global _journal
+    close_journal(completed=False)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS journal ('
+            'key TEXT PRIMARY KEY, request TEXT NOT NULL, '
+            'status TEXT NOT NULL)'
+        )
+    _journal = {'connection': connection, 'counts': {}}
+
+
+def close_journal(completed=True):
+    """Stop recording requests in the journal opened by `open_journal`
+
+    All requests are removed from the journal, so that the next run of the
+    job sends them again. Pass `completed=False` to keep them, e.g. when the
+    job failed and is going to be resumed."""
+    global _journal
+    if _journal is not None:
+        connection = _journal['connection']
+        if completed:
+            with connection:
+                connection.execute('DELETE FROM journal')
+        connection.close()
+        _journal = None
+
+
+@contextlib.contextmanager
+def journal(path):
+    """Record requests in a journal while in the `with` block
+
+    The journal is cleared when the block finishes and kept when it raises
+    an exception, so that running the block again resumes the job. See
+    `open_journal`."""
+    open_journal(path)
+    try:
+        yield
+    except BaseException:
+        close_journal(completed=False)
+        raise
+    close_journal()
+
+
+def _journaled(request, execute):
+    """Call `execute` unless `request` is recorded as done in the journal
+
+    Return True if `execute` was called, False if the request was skipped."""
+    if _journal is None:
+        execute()
+        return True
+    connection = _journal['connection']
+    request_json = json.dumps(request, sort_keys=True)
+    request_hash = hashlib.sha1(request_json.encode()).hexdigest()
+    count = _journal['counts'].get(request_hash, 0)
+    _journal['counts'][request_hash] = count + 1
+    key = '{}:{}'.format(request_hash, count)
+    row = connection.execute(
+        'SELECT status FROM journal WHERE key = ?', (key,)
+    ).fetchone()
+    if row is not None and row[0] == 'done':
+        print('Skipping request {} found in journal'.format(key))
+        return False
+    with connection:
+        connection.execute(
+            'INSERT OR REPLACE INTO journal (key, request, status) '
+            'VALUES (?, ?, ?)',
+            (key, request_json, 'pending'),
+        )
+    execute()
+    with connection:
+        connection.execute(
+            'UPDATE journal SET status = ? WHERE key = ?', ('done', key)
+        )
+    return True
+
+
 def _exec(service, spreadsheet_id, requests):
-    """Execute a batch of Sheets API `batchUpdate` requests"""
+    """Execute a batch of Sheets API `batchUpdate` requests
+
+    Return True if the requests were sent, False if they were skipped
+    because the journal records them as done."""
     print(requests)
     batch_update_request = {'requests': requests}
-    _wait()
-    (
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheet_id, body=batch_update_request)
-        .execute()
+
+    def execute():
+        _wait()
+        (
+            service.spreadsheets()
+            .batchUpdate(
+                spreadsheetId=spreadsheet_id, body=batch_update_request
+            )
+            .execute()
+        )
+
+    return _journaled(
+        {
+            'method': 'batchUpdate',
+            'spreadsheetId': spreadsheet_id,
+            'body': batch_update_request,
+        },
+        execute,
     )
 
 
@@ -127,6 +261,31 @@ def _read(service, spreadsheet_id, sheet_id=0, cell_range=None):
     return values
 
 
+def _read_sheet(service, spreadsheet_id, sheet_id=0):
+    """Read all cells in a sheet in a single request
+
+    Unlike `_read`, the sheet is selected by its ID, so reading a sheet
+    other than the first one doesn't need its title."""
+    _wait()
+    result = (
+        service.spreadsheets()
+        .values()
+        .batchGetByDataFilter(
+            spreadsheetId=spreadsheet_id,
+            body={
+                'dataFilters': [{'gridRange': {'sheetId': sheet_id}}],
+                'valueRenderOption': 'FORMULA',
+            },
+        )
+        .execute()
+    )
+    value_ranges = result.get('valueRanges', [])
+    if not value_ranges:
+        return []
+    values = value_ranges[0].get('valueRange', {}).get('values', [])
+    return values
+
+
 def read_cell(service, spreadsheet_id, row_index, column_index, sheet_id=0):
     """Read a cell value"""
     cell_range = a1(row_index, column_index)
@@ -146,18 +305,32 @@ def update(service, spreadsheet_id, rows, begin=1):
     if parameter `begin` is passed."""
     rows_len = len(rows)
     print('Updating {} rows.'.format(rows_len))
-    _wait()
-    (
-        service.spreadsheets()
-        .values()
-        .update(
-            spreadsheetId=spreadsheet_id,
-            range='{begin}:{end}'.format(begin=begin, end=begin + rows_len),
-            valueInputOption='USER_ENTERED',
-            body={'values': rows},
+    cell_range = '{begin}:{end}'.format(begin=begin, end=begin + rows_len)
+
+    def execute():
+        _wait()
+        (
+            service.spreadsheets()
+            .values()
+            .update(
+                spreadsheetId=spreadsheet_id,
+                range=cell_range,
+                valueInputOption='USER_ENTERED',
+                body={'values': rows},
+            )
+            .execute()
         )
-        .execute()
+
+    _journaled(
+        {
+            'method': 'update',
+            'spreadsheetId': spreadsheet_id,
+            'range': cell_range,
+            'body': {'values': rows},
+        },
+        execute,
     )
+    _clear_grid_sizes(spreadsheet_id)
 
 
 def set_properties(
@@ -192,23 +365,27 @@ def set_properties(
     _exec(service, spreadsheet_id, requests)
 
 
-def resize_grid(service, spreadsheet_id, row_count, column_count):
-    """Set number of rows in a sheet"""
+def resize_grid(service, spreadsheet_id, row_count, column_count, sheet_id=0):
+    """Set number of rows and columns in a sheet"""
     requests = [
         {
             'updateSheetProperties': {
                 'properties': {
+                    'sheetId': sheet_id,
                     'gridProperties': {
                         'rowCount': row_count,
                         'columnCount': column_count,
-                    }
+                    },
                 },
                 'fields': 'gridProperties.rowCount,gridProperties.columnCount',
             }
         }
     ]
     print('Resizing grid')
-    _exec(service, spreadsheet_id, requests)
+    if _exec(service, spreadsheet_id, requests):
+        _set_grid_size(spreadsheet_id, sheet_id, row_count, column_count)
+    else:
+        _clear_grid_sizes(spreadsheet_id)
 
 
 def is_first_cell_empty(service, spreadsheet_id, sheet_id=0):
@@ -219,16 +396,71 @@ def is_first_cell_empty(service, spreadsheet_id, sheet_id=0):
     return not rows
 
 
+_grid_sizes = {}
+
+
+def get_grid_size(service, spreadsheet_id, sheet_id=0, refresh=False):
+    """Get number of rows and columns in a sheet as a tuple
+
+    Return None if the sheet doesn't exist. The grid size of all sheets in
+    the spreadsheet is cached after the first call. The cache is updated by
+    the functions of this module that resize the grid and cleared by `move`
+    and `update`, but it goes stale when the sheet is changed by other
+    users. Pass `refresh=True` to read it from the Sheets API again."""
+    key = (spreadsheet_id, sheet_id)
+    if refresh or key not in _grid_sizes:
+        print('Reading grid size')
+        _wait()
+        result = (
+            service.spreadsheets()
+            .get(spreadsheetId=spreadsheet_id, fields='sheets.properties')
+            .execute()
+        )
+        for sheet in result.get('sheets', []):
+            properties = sheet['properties']
+            grid_properties = properties.get('gridProperties', {})
+            _grid_sizes[(spreadsheet_id, properties['sheetId'])] = (
+                grid_properties.get('rowCount', 0),
+                grid_properties.get('columnCount', 0),
+            )
+    return _grid_sizes.get(key)
+
+
+def _set_grid_size(spreadsheet_id, sheet_id, row_count, column_count):
+    _grid_sizes[(spreadsheet_id, sheet_id)] = (row_count, column_count)
+
+
+def _clear_grid_sizes(spreadsheet_id):
+    """Remove the cached grid size of all sheets in a spreadsheet"""
+    for key in list(_grid_sizes):
+        if key[0] == spreadsheet_id:
+            del _grid_sizes[key]
+
+
 def get_row_count(service, spreadsheet_id, sheet_id=0):
     """Get total number of rows in a sheet"""
     print('Reading total row count')
-    result = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-    sheets = result.get('sheets')
-    for sheet in sheets:
-        if sheet['properties']['sheetId'] == sheet_id:
-            row_count = sheet['properties']['gridProperties']['rowCount']
-            print('Total row count {}'.format(row_count))
-            return row_count
+    grid_size = get_grid_size(
+        service, spreadsheet_id, sheet_id=sheet_id, refresh=True
+    )
+    if grid_size is None:
+        return None
+    row_count, _ = grid_size
+    print('Total row count {}'.format(row_count))
+    return row_count
+
+
+def get_column_count(service, spreadsheet_id, sheet_id=0):
+    """Get total number of columns in a sheet"""
+    print('Reading total column count')
+    grid_size = get_grid_size(
+        service, spreadsheet_id, sheet_id=sheet_id, refresh=True
+    )
+    if grid_size is None:
+        return None
+    _, column_count = grid_size
+    print('Total column count {}'.format(column_count))
+    return column_count
 
 
 def get_filled_rows_count(
@@ -243,6 +475,209 @@ def get_filled_rows_count(
     return count
 
 
+WATCH_INTERVAL = 60
+DIFF_MAX_EDITS = 1000
+
+
+def _append_changes(changes, old_rows, new_rows, i1, i2, j1, j2):
+    """Report rows `i1` to `i2` of `old_rows` replaced by rows `j1` to `j2`
+    of `new_rows` as updated rows followed by deleted or inserted rows"""
+    updated_count = min(i2 - i1, j2 - j1)
+    for k in range(updated_count):
+        if old_rows[i1 + k] != new_rows[j1 + k]:
+            changes.append(('updated', j1 + k, new_rows[j1 + k]))
+    for row_index in range(i1 + updated_count, i2):
+        changes.append(('deleted', row_index, old_rows[row_index]))
+    for row_index in range(j1 + updated_count, j2):
+        changes.append(('inserted', row_index, new_rows[row_index]))
+
+
+def _shortest_edits(old_rows, new_rows, i1, i2, j1, j2, max_edits):
+    """Find the shortest list of deleted and inserted rows that turns rows
+    `i1` to `i2` of `old_rows` into rows `j1` to `j2` of `new_rows`
+
+    Return a list of tuples `(is_insertion, old_row_index, new_row_index)`
+    in the order of the rows, or None if more than `max_edits` edits are
+    needed. See Eugene W. Myers, An O(ND) Difference Algorithm and Its
+    Variations."""
+    n = i2 - i1
+    m = j2 - j1
+    # Furthest old row index reached on each diagonal k, stored at [k + d]
+    furthest = [0]
+    trace = []
+    for d in range(max_edits + 1):
+        previous = furthest
+        furthest = [0] * (2 * d + 1)
+        for k in range(-d, d + 1, 2):
+            if k == -d or (
+                k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]
+            ):
+                x = previous[k + 1 + d - 1] if d else 0
+            else:
+                x = previous[k - 1 + d - 1] + 1
+            y = x - k
+            while x < n and y < m and old_rows[i1 + x] == new_rows[j1 + y]:
+                x += 1
+                y += 1
+            furthest[k + d] = x
+            if x >= n and y >= m:
+                trace.append(furthest)
+                return _backtrack_edits(trace, n, m, i1, j1)
+        trace.append(furthest)
+    return None
+
+
+def _backtrack_edits(trace, x, y, i1, j1):
+    """Walk the `trace` of `_shortest_edits` back from the end of the rows
+    and collect the edits"""
+    edits = []
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (
+            k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]
+        ):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        x = previous[previous_k + d - 1]
+        y = x - previous_k
+        if previous_k == k + 1:
+            edits.append((True, i1 + x, j1 + y))
+        else:
+            edits.append((False, i1 + x, j1 + y))
+    edits.reverse()
+    return edits
+
+
+def _compact_edits(edits, old_rows, new_rows):
+    """Move each edit over the equal rows around it next to another edit,
+    where the rows are the same as the edited one
+
+    The shortest edits are not unique when rows repeat. Without this, a row
+    changed among blank rows could be found as an inserted row and a
+    deleted blank row far from it, instead of a single updated row."""
+    edits = [list(edit) for edit in edits]
+
+    def is_run(is_insertion, start, end):
+        rows = new_rows if is_insertion else old_rows
+        return all(rows[k] == rows[start] for k in range(start, end))
+
+    for index in range(len(edits) - 1):
+        is_insertion, x, y = edits[index]
+        end_x = x if is_insertion else x + 1
+        gap = edits[index + 1][1] - end_x
+        start = y if is_insertion else x
+        if gap > 0 and is_run(is_insertion, start, start + gap + 1):
+            edits[index][1:] = [x + gap, y + gap]
+    for index in range(len(edits) - 1, 0, -1):
+        is_insertion, x, y = edits[index]
+        previous_is_insertion, previous_x, _ = edits[index - 1]
+        previous_end_x = (
+            previous_x if previous_is_insertion else previous_x + 1
+        )
+        gap = x - previous_end_x
+        end = (y if is_insertion else x) + 1
+        if gap > 0 and is_run(is_insertion, end - gap - 1, end):
+            edits[index][1:] = [x - gap, y - gap]
+    return edits
+
+
+def diff_rows(old_rows, new_rows):
+    """Compare two lists of rows and return a list of changes as tuples
+    `(change_type, row_index, row)`
+
+    `change_type` is 'inserted', 'updated' or 'deleted'. The `row_index` of
+    deleted rows refers to `old_rows`, the `row_index` of other changes to
+    `new_rows`.
+
+    Rows equal at the beginning and at the end of the lists are skipped and
+    the rest is compared with the Myers diff algorithm, so that inserted and
+    deleted rows are detected also in the middle of the sheet. It takes time
+    proportional to the number of rows times the number of changes, so when
+    more than `DIFF_MAX_EDITS` rows are inserted or deleted, the rows are
+    compared by position instead.
+
+    When many rows are the same, e.g. blank, there are several ways to
+    describe the changes and a changed row can be reported as an inserted
+    row and a deleted row."""
+    old_rows = [tuple(row) for row in old_rows]
+    new_rows = [tuple(row) for row in new_rows]
+    i1, i2 = 0, len(old_rows)
+    j1, j2 = 0, len(new_rows)
+    while i1 < i2 and j1 < j2 and old_rows[i1] == new_rows[j1]:
+        i1 += 1
+        j1 += 1
+    while i1 < i2 and j1 < j2 and old_rows[i2 - 1] == new_rows[j2 - 1]:
+        i2 -= 1
+        j2 -= 1
+    changes = []
+    edits = _shortest_edits(old_rows, new_rows, i1, i2, j1, j2, DIFF_MAX_EDITS)
+    if edits is None:
+        _append_changes(changes, old_rows, new_rows, i1, i2, j1, j2)
+        edits = []
+    edits = _compact_edits(edits, old_rows, new_rows)
+    # Group adjacent edits, so that a row deleted and a row inserted at the
+    # same place are reported as an updated row
+    block = None
+    for is_insertion, old_row_index, new_row_index in edits:
+        if block is not None and (
+            block[1] != old_row_index or block[3] != new_row_index
+        ):
+            _append_changes(changes, old_rows, new_rows, *block)
+            block = None
+        if block is None:
+            block = [
+                old_row_index,
+                old_row_index,
+                new_row_index,
+                new_row_index,
+            ]
+        if is_insertion:
+            block[3] += 1
+        else:
+            block[1] += 1
+    if block is not None:
+        _append_changes(changes, old_rows, new_rows, *block)
+    return [
+        (change_type, row_index, list(row))
+        for change_type, row_index, row in changes
+    ]
+
+
+def poll_changes(service, spreadsheet_id, old_rows=None, sheet_id=0):
+    """Read all rows in a sheet and compare them with `old_rows`
+
+    Return a tuple of a list of changes and the rows read, which can be
+    passed as `old_rows` to the next call. See `diff_rows` for the format of
+    the changes. No changes are returned when `old_rows` is None.
+
+    This is not a change feed. The spreadsheets scope gives access neither
+    to revisions nor to change notifications of the spreadsheet, so there is
+    no cheaper way to tell whether the sheet changed. Every call reads the
+    whole sheet in a single request and compares it in Python."""
+    rows = _read_sheet(service, spreadsheet_id, sheet_id=sheet_id)
+    if old_rows is None:
+        return [], rows
+    changes = diff_rows(old_rows, rows)
+    print('Found {} changed rows'.format(len(changes)))
+    return changes, rows
+
+
+def watch(service, spreadsheet_id, interval=WATCH_INTERVAL, sheet_id=0):
+    """Call `poll_changes` every `interval` seconds and yield changes made
+    since the previous call
+
+    See `diff_rows` for the format of the changes."""
+    _, rows = poll_changes(service, spreadsheet_id, sheet_id=sheet_id)
+    while True:
+        time.sleep(interval)
+        changes, rows = poll_changes(
+            service, spreadsheet_id, old_rows=rows, sheet_id=sheet_id
+        )
+        yield from changes
+
+
 def move(service, spreadsheet_id, row_count, start_row_index=0, sheet_id=0):
     """Move rows down by `row_count` steps"""
     requests = [
@@ -264,6 +699,7 @@ def move(service, spreadsheet_id, row_count, start_row_index=0, sheet_id=0):
     ]
     print('Moving existing rows')
     _exec(service, spreadsheet_id, requests)
+    _clear_grid_sizes(spreadsheet_id)
 
 
 def auto_resize(
@@ -469,12 +905,20 @@ def format_columns(
     padding=None,
     wrap_strategy=None,
     sheet_id=0,
+    end_row_index=None,
 ):
-    """Format all cells in several columns"""
+    """Format all cells in several columns
+
+    Format the columns down to the last row of the grid by default or to
+    another row if parameter `end_row_index` is passed."""
+    if end_row_index is None:
+        end_row_index = get_row_count(
+            service, spreadsheet_id, sheet_id=sheet_id
+        )
     cell_range = {
         'sheetId': sheet_id,
         'startRowIndex': start_row_index,
-        'endRowIndex': 1000,
+        'endRowIndex': end_row_index,
         'startColumnIndex': start_column_index,
         'endColumnIndex': end_column_index,
     }
@@ -620,46 +1064,220 @@ def _format_range(service, spreadsheet_id, cell_range, cell_format, fields):
     _exec(service, spreadsheet_id, requests)
 
 
-def clear_formatting(
-    service, spreadsheet_id, start_row_index=0, end_row_index=0, sheet_id=0
+DIMENSION_CHUNK_SIZE = 10000
+
+
+def _dimension_chunks(start_index, end_index, chunk_size=DIMENSION_CHUNK_SIZE):
+    """Split the half-open interval from `start_index` to `end_index` into
+    intervals of at most `chunk_size` items"""
+    chunks = []
+    for chunk_start_index in range(start_index, end_index, chunk_size):
+        chunk_end_index = min(chunk_start_index + chunk_size, end_index)
+        chunks.append((chunk_start_index, chunk_end_index))
+    return chunks
+
+
+def _dimension_end_index(
+    service, spreadsheet_id, dimension, sheet_id=0, refresh=False
 ):
-    cell_range = {
-        'sheetId': sheet_id,
-        'startRowIndex': start_row_index,
-        'startColumnIndex': end_row_index,
-    }
+    """Get the number of rows or columns in a sheet based on `dimension`"""
+    grid_size = get_grid_size(
+        service, spreadsheet_id, sheet_id=sheet_id, refresh=refresh
+    )
+    if grid_size is None:
+        raise ValueError('Unknown sheet {}'.format(sheet_id))
+    row_count, column_count = grid_size
+    if dimension == 'ROWS':
+        return row_count
+    if dimension == 'COLUMNS':
+        return column_count
+    raise ValueError('Unknown dimension {}'.format(dimension))
+
+
+def _dimension_interval(
+    service, spreadsheet_id, dimension, start_index, end_index, sheet_id=0
+):
+    """Validate the interval from `start_index` to `end_index` and limit it
+    to the size of the grid
+
+    The grid size is read from the Sheets API again when `end_index` is None,
+    so that the interval reaches the real end of the grid.
+
+    Return a tuple of the start index, the end index and the number of rows
+    or columns in the sheet."""
+    if start_index < 0:
+        raise ValueError('Invalid start index {}'.format(start_index))
+    if end_index is not None and start_index > end_index:
+        raise ValueError(
+            'Start index {} is greater than end index {}'.format(
+                start_index, end_index
+            )
+        )
+    grid_end_index = _dimension_end_index(
+        service,
+        spreadsheet_id,
+        dimension,
+        sheet_id=sheet_id,
+        refresh=end_index is None,
+    )
+    if end_index is None or end_index > grid_end_index:
+        end_index = grid_end_index
+    return start_index, end_index, grid_end_index
+
+
+def _dimension_grid_range(sheet_id, dimension, start_index, end_index):
+    """Convert a dimension interval to a GridRange spanning all cells in the
+    given rows or columns"""
+    if dimension == 'ROWS':
+        return {
+            'sheetId': sheet_id,
+            'startRowIndex': start_index,
+            'endRowIndex': end_index,
+        }
+    if dimension == 'COLUMNS':
+        return {
+            'sheetId': sheet_id,
+            'startColumnIndex': start_index,
+            'endColumnIndex': end_index,
+        }
+    raise ValueError('Unknown dimension {}'.format(dimension))
+
+
+def clear_dimension(
+    service,
+    spreadsheet_id,
+    dimension,
+    start_index=0,
+    end_index=None,
+    fields='userEnteredValue',
+    chunk_size=DIMENSION_CHUNK_SIZE,
+    sheet_id=0,
+):
+    """Clear `fields` of all cells in rows or columns (based on `dimension`)
+    from `start_index` to `end_index`
+
+    Clear to the end of the grid by default. Large ranges are split into
+    chunks of `chunk_size` rows or columns sent in a single batch."""
+    start_index, end_index, _ = _dimension_interval(
+        service,
+        spreadsheet_id,
+        dimension,
+        start_index,
+        end_index,
+        sheet_id=sheet_id,
+    )
     requests = [
         {
             'repeatCell': {
-                'range': cell_range,
+                'range': _dimension_grid_range(
+                    sheet_id, dimension, chunk_start_index, chunk_end_index
+                ),
                 'cell': {},
-                'fields': 'userEnteredFormat',
+                'fields': fields,
             }
         }
+        for chunk_start_index, chunk_end_index in _dimension_chunks(
+            start_index, end_index, chunk_size=chunk_size
+        )
     ]
-    print('Clearing formatting')
+    if not requests:
+        return
+    print(
+        'Clearing {} {} from {} to {}'.format(
+            fields, dimension.lower(), start_index, end_index
+        )
+    )
     _exec(service, spreadsheet_id, requests)
 
 
-def delete_all_rows(service, spreadsheet_id, sheet_id=0):
-    """Delete all rows in the sheet except for the first one, because
-    Google Sheets require at least one row in a sheet
-
-    Currently the Sheets API throws error 503 'The service is currently
-    unavailable.'"""
+def delete_dimension(
+    service,
+    spreadsheet_id,
+    dimension,
+    start_index=0,
+    end_index=None,
+    chunk_size=DIMENSION_CHUNK_SIZE,
+    sheet_id=0,
+):
+    """Delete rows or columns (based on `dimension`) from `start_index`
+    to `end_index`
+
+    Delete to the end of the grid by default. Large ranges are split into
+    chunks of `chunk_size` rows or columns sent in a single batch, deleting
+    from the last chunk so that the indexes of the remaining chunks stay
+    valid. Google Sheets require at least one row and one column in a sheet,
+    so deleting all of them raises ValueError."""
+    start_index, end_index, grid_end_index = _dimension_interval(
+        service,
+        spreadsheet_id,
+        dimension,
+        start_index,
+        end_index,
+        sheet_id=sheet_id,
+    )
+    if start_index == 0 and end_index == grid_end_index:
+        raise ValueError(
+            'Cannot delete all {} in a sheet'.format(dimension.lower())
+        )
+    chunks = _dimension_chunks(start_index, end_index, chunk_size=chunk_size)
     requests = [
         {
             'deleteDimension': {
                 'range': {
                     'sheetId': sheet_id,
-                    'dimension': 'ROWS',
-                    'startIndex': 1,
+                    'dimension': dimension,
+                    'startIndex': chunk_start_index,
+                    'endIndex': chunk_end_index,
                 }
             }
         }
+        for chunk_start_index, chunk_end_index in reversed(chunks)
     ]
-    print('Deleting all rows')
-    _exec(service, spreadsheet_id, requests)
+    if not requests:
+        return
+    print(
+        'Deleting {} from {} to {}'.format(
+            dimension.lower(), start_index, end_index
+        )
+    )
+    if not _exec(service, spreadsheet_id, requests):
+        # The request was sent by an earlier run of the job, so the grid
+        # size read above may already be without the deleted rows or columns
+        _clear_grid_sizes(spreadsheet_id)
+        return
+    row_count, column_count = get_grid_size(
+        service, spreadsheet_id, sheet_id=sheet_id
+    )
+    deleted_count = end_index - start_index
+    if dimension == 'ROWS':
+        row_count -= deleted_count
+    else:
+        column_count -= deleted_count
+    _set_grid_size(spreadsheet_id, sheet_id, row_count, column_count)
+
+
+def clear_formatting(
+    service, spreadsheet_id, start_row_index=0, end_row_index=None, sheet_id=0
+):
+    """Clear formatting of all cells in rows from `start_row_index` to
+    `end_row_index` (to the end of the grid by default)"""
+    clear_dimension(
+        service,
+        spreadsheet_id,
+        'ROWS',
+        start_index=start_row_index,
+        end_index=end_row_index,
+        fields='userEnteredFormat',
+        sheet_id=sheet_id,
+    )
+
+
+def delete_all_rows(service, spreadsheet_id, sheet_id=0):
+    """Delete all rows in the sheet except for the first one, because
+    Google Sheets require at least one row in a sheet"""
+    delete_dimension(
+        service, spreadsheet_id, 'ROWS', start_index=1, sheet_id=sheet_id
+    )
 
 
 def format_formula_image(url):
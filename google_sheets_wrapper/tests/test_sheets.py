@@ -1,4 +1,7 @@
+import os.path
+import tempfile
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from google_sheets_wrapper import sheets
 
@@ -25,3 +28,402 @@ class Test(TestCase):
             ),
             'http://www.example.com/example.jpg',
         )
+
+
+class TestAuthenticate(TestCase):
+    @patch('google_sheets_wrapper.sheets.build')
+    @patch('google_sheets_wrapper.sheets.get_credentials')
+    def test_authenticate_http(self, get_credentials, build):
+        http = MagicMock(timeout=30)
+        sheets.authenticate(
+            'client_secrets', 'credentials', http=http, timeout=10
+        )
+        self.assertEqual(http.timeout, 30)
+        _, kwargs = build.call_args
+        authorized_http = kwargs['http']
+        self.assertIs(authorized_http.http, http)
+        self.assertIs(
+            authorized_http.credentials, get_credentials.return_value
+        )
+        self.assertNotIn('credentials', kwargs)
+
+    @patch('google_sheets_wrapper.sheets.build')
+    @patch('google_sheets_wrapper.sheets.get_credentials')
+    def test_authenticate_default_http(self, get_credentials, build):
+        sheets.authenticate('client_secrets', 'credentials')
+        _, kwargs = build.call_args
+        self.assertEqual(
+            kwargs['http'].http.timeout, sheets.build_http().timeout
+        )
+        sheets.authenticate('client_secrets', 'credentials', timeout=10)
+        _, kwargs = build.call_args
+        self.assertEqual(kwargs['http'].http.timeout, 10)
+
+
+class TestDimension(TestCase):
+    def setUp(self):
+        sheets._grid_sizes.clear()
+        self.service = MagicMock()
+        spreadsheets = self.service.spreadsheets.return_value
+        spreadsheets.get.return_value.execute.return_value = {
+            'sheets': [
+                {
+                    'properties': {
+                        'sheetId': 0,
+                        'gridProperties': {
+                            'rowCount': 25000,
+                            'columnCount': 26,
+                        },
+                    }
+                }
+            ]
+        }
+        self.batch_update = spreadsheets.batchUpdate
+
+    def get_requests(self):
+        _, kwargs = self.batch_update.call_args
+        return kwargs['body']['requests']
+
+    def test_dimension_chunks(self):
+        self.assertEqual(
+            sheets._dimension_chunks(1, 25, chunk_size=10),
+            [(1, 11), (11, 21), (21, 25)],
+        )
+        self.assertEqual(sheets._dimension_chunks(5, 5, chunk_size=10), [])
+
+    def test_get_grid_size_cached(self):
+        self.assertEqual(
+            sheets.get_grid_size(self.service, 'spreadsheet'), (25000, 26)
+        )
+        self.assertEqual(
+            sheets.get_grid_size(self.service, 'spreadsheet'), (25000, 26)
+        )
+        spreadsheets = self.service.spreadsheets.return_value
+        self.assertEqual(spreadsheets.get.call_count, 1)
+
+    def test_delete_all_rows(self):
+        sheets.delete_all_rows(self.service, 'spreadsheet')
+        ranges = [r['deleteDimension']['range'] for r in self.get_requests()]
+        self.assertEqual(
+            [(r['startIndex'], r['endIndex']) for r in ranges],
+            [(20001, 25000), (10001, 20001), (1, 10001)],
+        )
+        self.assertEqual(self.batch_update.call_count, 1)
+        self.assertEqual(
+            sheets.get_grid_size(self.service, 'spreadsheet'), (1, 26)
+        )
+
+    def test_get_row_count_not_cached(self):
+        sheets.get_row_count(self.service, 'spreadsheet')
+        sheets.get_row_count(self.service, 'spreadsheet')
+        spreadsheets = self.service.spreadsheets.return_value
+        self.assertEqual(spreadsheets.get.call_count, 2)
+
+    def test_move_clears_grid_size(self):
+        sheets.get_grid_size(self.service, 'spreadsheet')
+        sheets.move(self.service, 'spreadsheet', 2)
+        sheets.get_grid_size(self.service, 'spreadsheet')
+        spreadsheets = self.service.spreadsheets.return_value
+        self.assertEqual(spreadsheets.get.call_count, 2)
+
+    def test_delete_dimension_invalid(self):
+        with self.assertRaises(ValueError):
+            sheets.delete_dimension(self.service, 'spreadsheet', 'ROWS')
+        with self.assertRaises(ValueError):
+            sheets.delete_dimension(
+                self.service, 'spreadsheet', 'ROWS', start_index=1, sheet_id=1
+            )
+        self.batch_update.assert_not_called()
+
+    def test_delete_all_rows_refreshes_grid_size(self):
+        sheets._set_grid_size('spreadsheet', 0, 10, 26)
+        sheets.delete_all_rows(self.service, 'spreadsheet')
+        ranges = [r['deleteDimension']['range'] for r in self.get_requests()]
+        self.assertEqual(ranges[0]['endIndex'], 25000)
+
+    def test_dimension_start_after_end(self):
+        with self.assertRaises(ValueError):
+            sheets.clear_dimension(
+                self.service,
+                'spreadsheet',
+                'ROWS',
+                start_index=10,
+                end_index=5,
+            )
+        with self.assertRaises(ValueError):
+            sheets.delete_dimension(
+                self.service,
+                'spreadsheet',
+                'ROWS',
+                start_index=10,
+                end_index=5,
+            )
+        self.batch_update.assert_not_called()
+
+    def test_clear_dimension_limited_to_grid(self):
+        sheets.clear_dimension(
+            self.service,
+            'spreadsheet',
+            'COLUMNS',
+            start_index=20,
+            end_index=100,
+        )
+        self.assertEqual(
+            self.get_requests()[0]['repeatCell']['range'],
+            {'sheetId': 0, 'startColumnIndex': 20, 'endColumnIndex': 26},
+        )
+
+    def test_clear_formatting(self):
+        sheets.clear_formatting(
+            self.service, 'spreadsheet', start_row_index=2, end_row_index=5
+        )
+        self.assertEqual(
+            self.get_requests(),
+            [
+                {
+                    'repeatCell': {
+                        'range': {
+                            'sheetId': 0,
+                            'startRowIndex': 2,
+                            'endRowIndex': 5,
+                        },
+                        'cell': {},
+                        'fields': 'userEnteredFormat',
+                    }
+                }
+            ],
+        )
+
+
+class TestPollChanges(TestCase):
+    def test_diff_rows(self):
+        self.assertEqual(
+            sheets.diff_rows(
+                [['a'], ['b'], ['c'], ['d'], ['e']],
+                [['a'], ['b'], ['c'], ['x']],
+            ),
+            [('updated', 3, ['x']), ('deleted', 4, ['e'])],
+        )
+
+    def test_diff_rows_inserted_in_middle(self):
+        self.assertEqual(
+            sheets.diff_rows(
+                [['a'], ['b'], ['c'], ['d']],
+                [['a'], ['x'], ['b'], ['c'], ['d']],
+            ),
+            [('inserted', 1, ['x'])],
+        )
+
+    def test_diff_rows_deleted_in_middle(self):
+        self.assertEqual(
+            sheets.diff_rows(
+                [['a'], ['b'], ['c'], ['d']], [['a'], ['c'], ['d']]
+            ),
+            [('deleted', 1, ['b'])],
+        )
+
+    def test_diff_rows_large(self):
+        old_rows = [[] if i % 3 else [str(i % 7)] for i in range(20000)]
+        new_rows = [list(row) for row in old_rows]
+        for row_index in range(100, 20000, 400):
+            new_rows[row_index] = ['x', str(row_index)]
+        new_rows.insert(10000, ['inserted'])
+        del new_rows[5000]
+        changes = sheets.diff_rows(old_rows, new_rows)
+        self.assertIn(('inserted', 9999, ['inserted']), changes)
+        self.assertIn(('deleted', 5000, old_rows[5000]), changes)
+        self.assertEqual(
+            sorted(change_type for change_type, _, _ in changes),
+            ['deleted', 'inserted'] + ['updated'] * 50,
+        )
+
+    @patch('google_sheets_wrapper.sheets.DIFF_MAX_EDITS', 10)
+    def test_diff_rows_max_edits(self):
+        old_rows = [[str(i)] for i in range(30)]
+        new_rows = [[str(-i - 1)] for i in range(31)]
+        changes = sheets.diff_rows(old_rows, new_rows)
+        self.assertEqual(changes[0], ('updated', 0, ['-1']))
+        self.assertEqual(changes[-1], ('inserted', 30, ['-31']))
+        self.assertEqual(len(changes), 31)
+
+
+class TestPollChangesService(TestCase):
+    def setUp(self):
+        self.service = MagicMock()
+        spreadsheets = self.service.spreadsheets.return_value
+        self.get = spreadsheets.get
+        self.batch_get = spreadsheets.values.return_value.batchGetByDataFilter
+
+    def set_rows(self, rows):
+        self.batch_get.return_value.execute.return_value = {
+            'valueRanges': [{'valueRange': {'values': rows}}]
+        }
+
+    def test_poll_changes(self):
+        self.set_rows([['a'], ['b']])
+        changes, rows = sheets.poll_changes(
+            self.service, 'spreadsheet', sheet_id=7
+        )
+        self.assertEqual(changes, [])
+        self.set_rows([['a'], ['b'], ['c']])
+        changes, rows = sheets.poll_changes(
+            self.service, 'spreadsheet', old_rows=rows, sheet_id=7
+        )
+        self.assertEqual(changes, [('inserted', 2, ['c'])])
+        self.assertEqual(self.batch_get.call_count, 2)
+        _, kwargs = self.batch_get.call_args
+        self.assertEqual(
+            kwargs['body']['dataFilters'], [{'gridRange': {'sheetId': 7}}]
+        )
+        self.get.assert_not_called()
+
+    @patch('google_sheets_wrapper.sheets.time.sleep')
+    def test_watch(self, sleep):
+        self.batch_get.return_value.execute.side_effect = [
+            {'valueRanges': [{'valueRange': {'values': rows}}]}
+            for rows in ([['a'], ['b']], [['a'], ['b']], [['a'], ['x']])
+        ]
+        changes = sheets.watch(self.service, 'spreadsheet', interval=30)
+        self.assertEqual(next(changes), ('updated', 1, ['x']))
+        sleep.assert_called_with(30)
+        self.assertEqual(sleep.call_count, 2)
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmp_dir.name, 'journal.db')
+        self.service = MagicMock()
+        spreadsheets = self.service.spreadsheets.return_value
+        self.batch_update = spreadsheets.batchUpdate
+        self.values_update = spreadsheets.values.return_value.update
+        sheets._grid_sizes.clear()
+
+    def tearDown(self):
+        sheets.close_journal()
+        self.tmp_dir.cleanup()
+
+    def set_row_count(self, row_count):
+        spreadsheets = self.service.spreadsheets.return_value
+        spreadsheets.get.return_value.execute.return_value = {
+            'sheets': [
+                {
+                    'properties': {
+                        'sheetId': 0,
+                        'gridProperties': {
+                            'rowCount': row_count,
+                            'columnCount': 26,
+                        },
+                    }
+                }
+            ]
+        }
+
+    def fail_update(self, fail=True):
+        execute = self.values_update.return_value.execute
+        execute.side_effect = Exception() if fail else None
+
+    def run_job(self, delete_all_rows=False):
+        with sheets.journal(self.journal_path):
+            if delete_all_rows:
+                sheets.delete_all_rows(self.service, 'spreadsheet')
+            sheets.move(self.service, 'spreadsheet', 2)
+            sheets.update(self.service, 'spreadsheet', [['a'], ['b']])
+
+    def test_journal_skips_done_requests(self):
+        self.fail_update()
+        with self.assertRaises(Exception):
+            self.run_job()
+        self.assertEqual(self.batch_update.call_count, 1)
+        self.assertEqual(self.values_update.call_count, 1)
+        self.fail_update(False)
+        self.run_job()
+        self.assertEqual(self.batch_update.call_count, 1)
+        self.assertEqual(self.values_update.call_count, 2)
+
+    def test_journal_skips_done_request_after_noop(self):
+        self.set_row_count(10)
+        self.fail_update()
+        with self.assertRaises(Exception):
+            self.run_job(delete_all_rows=True)
+        self.assertEqual(self.batch_update.call_count, 2)
+
+        # The rows are already deleted, so delete_all_rows sends nothing
+        sheets._grid_sizes.clear()
+        self.set_row_count(1)
+        self.fail_update(False)
+        self.run_job(delete_all_rows=True)
+        self.assertEqual(self.batch_update.call_count, 2)
+        self.assertEqual(self.values_update.call_count, 2)
+
+    def test_journal_delete_dimension_resumed(self):
+        self.set_row_count(100)
+        self.fail_update()
+        with self.assertRaises(Exception):
+            with sheets.journal(self.journal_path):
+                sheets.delete_dimension(
+                    self.service,
+                    'spreadsheet',
+                    'ROWS',
+                    start_index=10,
+                    end_index=20,
+                )
+                sheets.update(self.service, 'spreadsheet', [['a']])
+
+        sheets._grid_sizes.clear()
+        self.set_row_count(90)
+        self.fail_update(False)
+        with sheets.journal(self.journal_path):
+            sheets.delete_dimension(
+                self.service,
+                'spreadsheet',
+                'ROWS',
+                start_index=10,
+                end_index=20,
+            )
+            sheets.update(self.service, 'spreadsheet', [['a']])
+            sheets.delete_dimension(
+                self.service,
+                'spreadsheet',
+                'ROWS',
+                start_index=1,
+                end_index=1000,
+            )
+        self.assertEqual(self.batch_update.call_count, 2)
+        _, kwargs = self.batch_update.call_args
+        ranges = [
+            request['deleteDimension']['range']
+            for request in kwargs['body']['requests']
+        ]
+        self.assertEqual(
+            [(r['startIndex'], r['endIndex']) for r in ranges], [(1, 90)]
+        )
+
+    def test_journal_sends_different_requests(self):
+        self.fail_update()
+        with self.assertRaises(Exception):
+            self.run_job()
+        with sheets.journal(self.journal_path):
+            sheets.move(self.service, 'spreadsheet', 3)
+            sheets.move(self.service, 'spreadsheet', 2)
+            sheets.move(self.service, 'spreadsheet', 2)
+        self.assertEqual(self.batch_update.call_count, 3)
+
+    def test_journal_cleared_after_success(self):
+        self.run_job()
+        self.run_job()
+        self.assertEqual(self.batch_update.call_count, 2)
+        self.assertEqual(self.values_update.call_count, 2)
+
+    def test_close_journal_not_completed(self):
+        sheets.open_journal(self.journal_path)
+        sheets.move(self.service, 'spreadsheet', 2)
+        sheets.close_journal(completed=False)
+        sheets.open_journal(self.journal_path)
+        sheets.move(self.service, 'spreadsheet', 2)
+        sheets.close_journal()
+        self.assertEqual(self.batch_update.call_count, 1)
+        sheets.open_journal(self.journal_path)
+        sheets.move(self.service, 'spreadsheet', 2)
+        sheets.close_journal()
+        self.assertEqual(self.batch_update.call_count, 2)